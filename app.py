@@ -92,10 +92,12 @@ def _init_default_playlist():
     """初始化系统默认歌单"""
     default_pl = PLAYLISTS_MANAGER.get_playlist(DEFAULT_PLAYLIST_ID)
     if not default_pl:
-        default_pl = PLAYLISTS_MANAGER.create_playlist("正在播放")
-        default_pl.id = DEFAULT_PLAYLIST_ID
-        PLAYLISTS_MANAGER._playlists[DEFAULT_PLAYLIST_ID] = default_pl
-        PLAYLISTS_MANAGER.save()
+        # create_playlist 和改 ID 后的保存合并为一次写入
+        with PLAYLISTS_MANAGER.batch():
+            default_pl = PLAYLISTS_MANAGER.create_playlist("正在播放")
+            default_pl.id = DEFAULT_PLAYLIST_ID
+            PLAYLISTS_MANAGER._playlists[DEFAULT_PLAYLIST_ID] = default_pl
+            PLAYLISTS_MANAGER.save()
         logger.debug(f"创建默认歌单: {DEFAULT_PLAYLIST_ID}")
     return default_pl
 
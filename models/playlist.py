@@ -135,7 +135,7 @@ class Playlist(BasePlaylist):
     def from_dict(self, data: dict):
         if isinstance(data, dict):
             items = data.get("items", [])
-            self._items = [Song.from_dict(item) if isinstance(item, dict) else item for item in items]
+            self._items = Song.from_dict_list(items)
             self._current_index = data.get("current_index", -1)
             self._max_size = data.get("max_size", None)
             if self._current_index >= len(self._items):
@@ -296,7 +296,7 @@ class CurrentPlaylist(BasePlaylist):
     def from_dict(self, data: dict):
         if isinstance(data, dict):
             items = data.get("items", [])
-            self._items = [Song.from_dict(item) if isinstance(item, dict) else item for item in items]
+            self._items = Song.from_dict_list(items)
             self._current_index = data.get("current_index", -1)
             if self._current_index >= len(self._items):
                 self._current_index = -1
@@ -425,12 +425,11 @@ class PlayHistory(Playlist):
                 if isinstance(data, list):
                     self._items = []
                     for item in data[: self._max_size]:
-                        # 从字典创建Song对象
-                        song = Song.from_dict(item) if isinstance(item, dict) else None
+                        # 从字典创建Song对象（直接使用记录中的时间戳，无需取当前时间）
+                        song = Song.from_dict(item, timestamp=item.get('ts', 0)) if isinstance(item, dict) else None
                         if song:
                             # 恢复播放历史特有属性
                             song.play_count = item.get('play_count', 1)
-                            song.timestamp = item.get('ts', 0)
                             song.ts = song.timestamp
                             # 恢复每次播放的时间戳列表
                             song.timestamps = item.get('timestamps', str(song.timestamp))
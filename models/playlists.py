@@ -4,18 +4,141 @@
 每个 Playlist 包含多首歌曲的路径
 """
 
+import hashlib
 import json
+import sys
 import time
 import os
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from functools import lru_cache
 from datetime import datetime
 from typing import List, Dict, Optional
 
 from models.song import StreamSong
 from models.logger import logger
 
+# 可选依赖 orjson：C 实现的 JSON 编解码，直接输出 UTF-8 bytes；未安装时回退到标准库 json
+try:
+    import orjson
+
+    def _dumps(obj) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+
+    _loads = orjson.loads
+except ImportError:
+
+    def _dumps(obj) -> bytes:
+        return json.dumps(obj, ensure_ascii=False, indent=2).encode("utf-8")
+
+    _loads = json.loads
+
 DEFAULT_PLAYLIST_ID = "default"
 
 
+@lru_cache(maxsize=4096)
+def _thumbnail_video_id(stream_type: str, url: str) -> str:
+    """解析可生成缩略图的 YouTube 视频 ID（只取决于这两个参数，跨歌单复用），没有时返回空字符串"""
+    song = StreamSong(stream_url=url, stream_type=stream_type)
+    return song.video_id if song.is_youtube() else ""
+
+
+def _resolve_thumbnail(stream_type: str, url: str) -> str:
+    """根据串流类型和 URL 计算缩略图
+
+    缩略图质量取决于 maxres 探测缓存，会随时间变化，因此只缓存视频 ID 的解析结果。
+    """
+    return StreamSong.best_thumbnail_url(_thumbnail_video_id(stream_type, url))
+
+
+def _song_key(song_item):
+    """歌曲的比较键：dict 歌曲取 URL，字符串歌曲取路径本身"""
+    return song_item.get("url") if isinstance(song_item, dict) else song_item
+
+
+def _intern_songs(songs: List) -> List:
+    """驻留歌曲 URL/路径字符串，同一首歌出现在多个歌单时共享同一个 str 对象"""
+    interned = []
+    for song_item in songs:
+        if isinstance(song_item, dict):
+            url = song_item.get("url")
+            if type(url) is str:
+                song_item["url"] = sys.intern(url)
+        elif type(song_item) is str:
+            song_item = sys.intern(song_item)
+        interned.append(song_item)
+    return interned
+
+
+def _digest(payload: bytes) -> bytes:
+    """文件内容摘要，用于判断是否需要重新写入"""
+    return hashlib.blake2b(payload, digest_size=16).digest()
+
+
+def _atomic_write_json(path: str, data) -> None:
+    """原子写入 JSON，见 _atomic_write_bytes"""
+    _atomic_write_bytes(path, _dumps(data))
+
+
+def _atomic_write_bytes(path: str, payload: bytes) -> None:
+    """原子写入：先完整写入同目录临时文件，再用 os.replace 覆盖目标
+
+    写入中途崩溃只会留下 .tmp 文件，目标文件始终是完整的旧版本或新版本。
+    """
+    tmp_path = path + ".tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(payload)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+class _SongList(list):
+    """歌曲列表 - 在 list 基础上记录原地修改次数
+
+    app.py / player.py 会直接对 playlist.songs 执行 insert/pop/append，
+    Playlist 通过 version 判断去重索引是否失效，失效时再按需重建。
+    """
+
+    __slots__ = ("version",)
+
+    def __init__(self, iterable=()):
+        super().__init__(iterable)
+        self.version = 0
+
+
+def _counted_mutator(name):
+    method = getattr(list, name)
+
+    def mutator(self, *args):
+        self.version += 1
+        return method(self, *args)
+
+    mutator.__name__ = name
+    return mutator
+
+
+for _name in (
+    "append",
+    "extend",
+    "insert",
+    "pop",
+    "remove",
+    "clear",
+    "__setitem__",
+    "__delitem__",
+    "__iadd__",
+    "__imul__",
+):
+    setattr(_SongList, _name, _counted_mutator(_name))
+
+
 class Playlist:
     """单个播放列表"""
 
@@ -45,8 +168,69 @@ class Playlist:
         self.updated_at = updated_at or time.time()
         self.current_playing_index = current_playing_index
 
-        # 确保串流歌曲具备缩略图（兼容旧数据）
-        self._hydrate_stream_thumbnails()
+        # 旧数据的串流缩略图延后补全，见 hydrate()
+        self._hydrated = False
+
+    @property
+    def name(self) -> str:
+        """歌单名称"""
+        return self._name
+
+    @name.setter
+    def name(self, value: str):
+        self._name = value
+        self._name_lower = (value or "").lower()  # 供 search_playlists 使用，避免每次搜索重复 lower()
+
+    @property
+    def songs(self) -> List:
+        """歌曲列表（dict 或路径字符串）"""
+        return self._songs
+
+    @songs.setter
+    def songs(self, value):
+        self._songs = value if isinstance(value, _SongList) else _SongList(value)
+        self._rebuild_index()
+
+    def _rebuild_index(self):
+        """重建去重索引：dict 歌曲按 URL，字符串歌曲按路径（纯缓存，不参与序列化）
+
+        索引按出现次数计数：旧数据、外部直接 insert 或 reorder_songs 都可能带来重复歌曲，
+        只有最后一份被移除时才从索引中删除。
+        """
+        songs = self._songs
+        self._url_index = Counter(s.get("url") for s in songs if isinstance(s, dict))
+        self._path_index = Counter(s for s in songs if isinstance(s, str))
+        self._index_version = songs.version
+
+    def _ensure_index(self):
+        """songs 被外部直接修改过时重建索引"""
+        if self._index_version != self._songs.version:
+            self._rebuild_index()
+
+    def _discard_from_index(self, song_item):
+        """从索引中移除一首歌曲（计数归零时才删除键）"""
+        if isinstance(song_item, dict):
+            index, key = self._url_index, song_item.get("url")
+        elif isinstance(song_item, str):
+            index, key = self._path_index, song_item
+        else:
+            return
+        count = index.get(key, 0)
+        if count > 1:
+            index[key] = count - 1
+        else:
+            index.pop(key, None)
+
+    def hydrate(self) -> bool:
+        """补全串流歌曲缩略图（每个歌单只执行一次）
+
+        返回:
+            True 如果有歌曲被补全，调用方需要保存
+        """
+        if self._hydrated:
+            return False
+        self._hydrated = True
+        return self._hydrate_stream_thumbnails()
 
     def _hydrate_stream_thumbnails(self):
         """补全串流歌曲的缩略图，避免旧数据缺失 thumbnail_url"""
@@ -56,17 +240,8 @@ class Playlist:
                 continue
             s_type = song_item.get("type")
             if s_type in ("youtube", "stream") and not song_item.get("thumbnail_url"):
-                url = song_item.get("url", "")
-                title = song_item.get("title")
-                duration = song_item.get("duration", 0)
                 try:
-                    stream_song = StreamSong(
-                        stream_url=url,
-                        title=title,
-                        stream_type=s_type,
-                        duration=duration,
-                    )
-                    thumb = stream_song.get_thumbnail_url()
+                    thumb = _resolve_thumbnail(s_type, song_item.get("url", ""))
                     if thumb:
                         song_item["thumbnail_url"] = thumb
                         changed = True
@@ -76,57 +251,75 @@ class Playlist:
             self.updated_at = time.time()
         return changed
 
-    def add_song(self, song_path_or_dict) -> bool:
-        """添加歌曲到歌单
-
-        参数:
-            song_path_or_dict: 歌曲文件路径(str)或完整song字典(dict)
+    def _index_new_song(self, song_item) -> bool:
+        """为待添加的歌曲补全缩略图并登记到去重索引
 
         返回:
-            True 如果添加成功，False 如果歌曲已存在
+            True 如果歌曲尚不在歌单中（已登记到索引），False 如果重复
         """
         # 支持dict和str两种格式
-        if isinstance(song_path_or_dict, dict):
-            song_item = song_path_or_dict
+        if isinstance(song_item, dict):
             # 补充串流歌曲缩略图
-            if (
-                isinstance(song_item, dict)
-                and song_item.get("type") in ("youtube", "stream")
-                and not song_item.get("thumbnail_url")
-            ):
+            if song_item.get("type") in ("youtube", "stream") and not song_item.get("thumbnail_url"):
                 try:
-                    stream_song = StreamSong(
-                        stream_url=song_item.get("url", ""),
-                        title=song_item.get("title"),
-                        stream_type=song_item.get("type"),
-                        duration=song_item.get("duration", 0),
-                    )
-                    thumb = stream_song.get_thumbnail_url()
+                    thumb = _resolve_thumbnail(song_item.get("type"), song_item.get("url", ""))
                     if thumb:
                         song_item["thumbnail_url"] = thumb
                 except Exception:
                     pass
             # 用URL作为唯一键进行去重检查
             url = song_item.get("url")
-            if not any(isinstance(s, dict) and s.get("url") == url for s in self.songs):
-                self.songs.insert(0, song_item)
-                self.updated_at = time.time()
-                return True
-        else:
-            # 字符串路径方式（向后兼容）
-            if song_path_or_dict not in self.songs:
-                self.songs.insert(0, song_path_or_dict)
-                self.updated_at = time.time()
-                return True
-        return False
+            if url in self._url_index:
+                return False
+            self._url_index[url] = 1
+            return True
+        # 字符串路径方式（向后兼容）
+        if song_item in self._path_index:
+            return False
+        self._path_index[song_item] = 1
+        return True
+
+    def add_song(self, song_path_or_dict) -> bool:
+        """添加歌曲到歌单
+
+        参数:
+            song_path_or_dict: 歌曲文件路径(str)或完整song字典(dict)
+
+        返回:
+            True 如果添加成功，False 如果歌曲已存在
+        """
+        self._ensure_index()
+        if not self._index_new_song(song_path_or_dict):
+            return False
+        self._songs.insert(0, song_path_or_dict)
+        self._index_version = self._songs.version
+        self.updated_at = time.time()
+        return True
+
+    def add_songs(self, songs: List) -> int:
+        """批量添加歌曲到歌单顶部
+
+        结果与依次调用 add_song 相同（后添加的在前），但只移动一次现有元素，
+        避免逐首 insert(0, ...) 导致的 O(N·K) 开销。
+
+        参数:
+            songs: 歌曲文件路径(str)或song字典(dict)的列表
+
+        返回:
+            实际添加的歌曲数量（已存在的歌曲被跳过）
+        """
+        self._ensure_index()
+        added = [song_item for song_item in songs if self._index_new_song(song_item)]
+        if added:
+            added.reverse()
+            self._songs[0:0] = added
+            self._index_version = self._songs.version
+            self.updated_at = time.time()
+        return len(added)
 
     def remove(self, index: int) -> bool:
         """按索引删除歌曲（兼容旧接口）"""
-        if 0 <= index < len(self.songs):
-            self.songs.pop(index)
-            self.updated_at = time.time()
-            return True
-        return False
+        return self.remove_song_at_index(index) is not None
 
     def reorder(self, from_index: int, to_index: int) -> bool:
         """调整歌曲顺序（兼容旧接口）"""
@@ -137,8 +330,10 @@ class Playlist:
             or not (0 <= to_index < len(self.songs))
         ):
             return False
-        song = self.songs.pop(from_index)
-        self.songs.insert(to_index, song)
+        self._ensure_index()
+        song = self._songs.pop(from_index)
+        self._songs.insert(to_index, song)
+        self._index_version = self._songs.version
         self.updated_at = time.time()
         return True
 
@@ -146,16 +341,27 @@ class Playlist:
         """从歌单移除歌曲
 
         参数:
-            song_path: 歌曲文件路径
+            song_path: 歌曲文件路径或 URL（同时匹配字符串歌曲和 dict 歌曲的 url）；
+                传入歌曲 dict 时按其 url 匹配
 
         返回:
             True 如果移除成功，False 如果歌曲不存在
         """
-        if song_path in self.songs:
-            self.songs.remove(song_path)
-            self.updated_at = time.time()
-            return True
-        return False
+        if isinstance(song_path, dict):
+            song_path = song_path.get("url")
+        if not isinstance(song_path, str):
+            return False
+        self._ensure_index()
+        # 不在索引中的直接返回，无需扫描列表
+        if song_path not in self._path_index and song_path not in self._url_index:
+            return False
+        index = next((i for i, s in enumerate(self._songs) if _song_key(s) == song_path), -1)
+        if index < 0:
+            return False
+        self._discard_from_index(self._songs.pop(index))
+        self._index_version = self._songs.version
+        self.updated_at = time.time()
+        return True
 
     def remove_song_at_index(self, index: int) -> Optional[str]:
         """按索引移除歌曲
@@ -167,7 +373,10 @@ class Playlist:
             被移除的歌曲路径，如果索引无效则返回 None
         """
         if 0 <= index < len(self.songs):
-            song_path = self.songs.pop(index)
+            self._ensure_index()
+            song_path = self._songs.pop(index)
+            self._discard_from_index(song_path)
+            self._index_version = self._songs.version
             self.updated_at = time.time()
             return song_path
         return None
@@ -194,7 +403,8 @@ class Playlist:
         返回:
             True 如果排序成功，False 如果新列表有效性检查失败
         """
-        if set(new_order) == set(self.songs):
+        # 按多重集合比较：元素可以是 dict，且重复歌曲不能被悄悄丢弃
+        if Counter(map(_song_key, new_order)) == Counter(map(_song_key, self.songs)):
             self.songs = new_order
             self.updated_at = time.time()
             return True
@@ -242,7 +452,7 @@ class Playlist:
         return cls(
             playlist_id=data.get("id"),
             name=data.get("name", "未命名歌单"),
-            songs=data.get("songs", []),
+            songs=_intern_songs(data.get("songs") or []),
             created_at=data.get("created_at"),
             updated_at=data.get("updated_at"),
             current_playing_index=data.get("current_playing_index", -1),
@@ -259,67 +469,113 @@ class Playlists:
             data_file: 保存歌单数据的文件路径
         """
         self.data_file = data_file
-        self._playlists: Dict[str, Playlist] = {}  # 按 ID 索引
-        self._order: List[str] = []  # 歌单的显示顺序
+        self._playlists: Dict[str, Playlist] = {}  # 按 ID 索引，插入顺序即显示顺序
+        self._dirty = False  # batch() 期间是否有未写入的修改
+        self._batch_depth = 0  # batch() 嵌套层数
+        self._write_lock = threading.Lock()  # 多个请求线程可能同时保存
+        self._last_digest: Optional[bytes] = None  # 最近一次读/写的文件内容摘要
         self.load()
 
     def load(self):
         """从文件加载歌单数据"""
+        # 先在局部构建完整的歌单字典再一次性替换，避免并发的 save() 写出只加载了一半的数据
+        playlists: Dict[str, Playlist] = {}
         if os.path.exists(self.data_file):
             try:
-                with open(self.data_file, "r", encoding="utf-8") as f:
-                    data = json.load(f)
+                with open(self.data_file, "rb") as f:
+                    raw = f.read()
+                    data = _loads(raw)
+                    self._last_digest = _digest(raw)
                     if isinstance(data, dict):
-                        self._order = data.get("order", [])
+                        order = data.get("order", [])
                         playlists_data = data.get("playlists", [])
                     else:
                         # 兼容旧格式（直接是列表）
-                        self._order = []
+                        order = []
                         playlists_data = data if isinstance(data, list) else []
 
-                    hydration_changed = False
+                    loaded = {}
                     for pl_data in playlists_data:
                         pl = Playlist.from_dict(pl_data)
-                        # 再次补全缩略图（兼容旧数据），如有变更稍后保存
-                        if pl._hydrate_stream_thumbnails():
-                            hydration_changed = True
-                        self._playlists[pl.id] = pl
-                        if pl.id not in self._order:
-                            self._order.append(pl.id)
-
-                    if hydration_changed:
-                        self.save()
-
-                    logger.debug(f"已加载 {len(self._playlists)} 个歌单")
-            except Exception as e:
-                logger.error(f"加载歌单失败: {e}")
-                self._playlists = {}
-                self._order = []
+                        loaded[pl.id] = pl
+                    # 先按保存的顺序排列，不在 order 中的歌单追加到末尾
+                    playlists = {pid: loaded.pop(pid) for pid in order if pid in loaded}
+                    playlists.update(loaded)
+
+                    logger.debug("已加载 %d 个歌单", len(playlists))
+            except Exception:
+                logger.exception("加载歌单失败")
+                playlists = {}
         else:
             logger.debug("歌单文件不存在，创建新的歌单集合")
-            self._playlists = {}
-            self._order = []
 
         # 确保存在默认歌单
-        if DEFAULT_PLAYLIST_ID not in self._playlists:
+        created_default = DEFAULT_PLAYLIST_ID not in playlists
+        if created_default:
             default_pl = Playlist(playlist_id=DEFAULT_PLAYLIST_ID, name="默认歌单")
-            self._playlists[DEFAULT_PLAYLIST_ID] = default_pl
-            if DEFAULT_PLAYLIST_ID not in self._order:
-                self._order.insert(0, DEFAULT_PLAYLIST_ID)
+            playlists = {DEFAULT_PLAYLIST_ID: default_pl, **playlists}
+
+        # 补全旧数据的串流缩略图：只做视频 ID 解析和缓存查找，不涉及网络，在发布前同步完成
+        hydrated = False
+        for pl in playlists.values():
+            try:
+                if pl.hydrate():
+                    hydrated = True
+            except Exception as e:
+                logger.warning("补全歌单缩略图失败 (%s): %s", pl.id, e)
+
+        self._playlists = playlists
+        if created_default or hydrated:
             self.save()
 
+    @contextmanager
+    def batch(self):
+        """批量修改期间推迟保存，退出最外层时只写一次文件
+
+        用法:
+            with playlists.batch():
+                for song in songs:
+                    playlists.add_song_to_playlist(pid, song)
+        """
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if not self._batch_depth:
+                self.flush()
+
+    def flush(self):
+        """立即写入 batch() 期间积累的修改"""
+        if self._dirty:
+            self._dirty = False
+            self._write()
+
     def save(self):
-        """保存歌单数据到文件"""
+        """保存歌单数据到文件（batch() 期间仅标记为待保存）"""
+        if self._batch_depth:
+            self._dirty = True
+            return
+        self._write()
+
+    def _write(self):
+        """将所有歌单写入文件"""
         try:
-            data = {
-                "order": self._order,
-                "playlists": [pl.to_dict() for pl in self.get_all()],
-            }
-            with open(self.data_file, "w", encoding="utf-8") as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
-            logger.debug(f"已保存 {len(self._playlists)} 个歌单")
-        except Exception as e:
-            logger.error(f"保存歌单失败: {e}")
+            with self._write_lock:
+                data = {
+                    "order": list(self._playlists),
+                    "playlists": [pl.to_dict() for pl in self.get_all()],
+                }
+                payload = _dumps(data)
+                digest = _digest(payload)
+                # 内容与磁盘上一致（如无实际变化的防御性保存）时跳过写入
+                if digest == self._last_digest:
+                    return
+                _atomic_write_bytes(self.data_file, payload)
+                self._last_digest = digest
+            logger.debug("已保存 %d 个歌单", len(self._playlists))
+        except Exception:
+            logger.exception("保存歌单失败")
 
     def create_playlist(self, name: str) -> Playlist:
         """创建新歌单
@@ -332,9 +588,8 @@ class Playlists:
         """
         playlist = Playlist(name=name)
         self._playlists[playlist.id] = playlist
-        self._order.append(playlist.id)
         self.save()
-        logger.debug(f"创建新歌单: {name} (ID: {playlist.id})")
+        logger.debug("创建新歌单: %s (ID: %s)", name, playlist.id)
         return playlist
 
     def get_playlist(self, playlist_id: str) -> Optional[Playlist]:
@@ -359,10 +614,8 @@ class Playlists:
         """
         if playlist_id in self._playlists:
             del self._playlists[playlist_id]
-            if playlist_id in self._order:
-                self._order.remove(playlist_id)
             self.save()
-            logger.debug(f"删除歌单: {playlist_id}")
+            logger.debug("删除歌单: %s", playlist_id)
             return True
         return False
 
@@ -381,7 +634,7 @@ class Playlists:
             playlist.name = new_name
             playlist.updated_at = time.time()
             self.save()
-            logger.debug(f"重命名歌单: {playlist_id} -> {new_name}")
+            logger.debug("重命名歌单: %s -> %s", playlist_id, new_name)
             return True
         return False
 
@@ -391,7 +644,7 @@ class Playlists:
         返回:
             Playlist 对象列表
         """
-        return [self._playlists[pid] for pid in self._order if pid in self._playlists]
+        return list(self._playlists.values())
 
     def get_all_dicts(self) -> List[Dict]:
         """获取所有歌单的字典表示
@@ -414,8 +667,8 @@ class Playlists:
         返回:
             True 如果排序成功，False 如果新列表有效性检查失败
         """
-        if set(new_order) == set(self._order):
-            self._order = new_order
+        if Counter(new_order) == Counter(self._playlists.keys()):
+            self._playlists = {pid: self._playlists[pid] for pid in new_order}
             self.save()
             return True
         return False
@@ -438,6 +691,24 @@ class Playlists:
             return result
         return False
 
+    def add_songs_to_playlist(self, playlist_id: str, songs: List) -> int:
+        """批量添加歌曲到指定歌单（只保存一次）
+
+        参数:
+            playlist_id: 歌单 ID
+            songs: 歌曲文件路径(str)或song字典(dict)的列表
+
+        返回:
+            实际添加的歌曲数量，歌单不存在时返回 0
+        """
+        playlist = self._playlists.get(playlist_id)
+        if playlist:
+            added = playlist.add_songs(songs)
+            if added:
+                self.save()
+            return added
+        return 0
+
     def remove_song_from_playlist(self, playlist_id: str, song_path: str) -> bool:
         """从歌单移除歌曲
 
@@ -535,12 +806,11 @@ class Playlists:
         playlist = self._playlists.get(playlist_id)
         if playlist:
             try:
-                with open(export_file, "w", encoding="utf-8") as f:
-                    json.dump(playlist.to_dict(), f, ensure_ascii=False, indent=2)
-                logger.debug(f"已导出歌单到: {export_file}")
+                _atomic_write_json(export_file, playlist.to_dict())
+                logger.debug("已导出歌单到: %s", export_file)
                 return True
-            except Exception as e:
-                logger.error(f"导出歌单失败: {e}")
+            except Exception:
+                logger.exception("导出歌单失败")
         return False
 
     def import_playlist(self, import_file: str) -> Optional[Playlist]:
@@ -553,16 +823,16 @@ class Playlists:
             导入的 Playlist 对象，如果导入失败则返回 None
         """
         try:
-            with open(import_file, "r", encoding="utf-8") as f:
-                data = json.load(f)
+            with open(import_file, "rb") as f:
+                data = _loads(f.read())
             playlist = Playlist.from_dict(data)
+            playlist.hydrate()
             self._playlists[playlist.id] = playlist
-            self._order.append(playlist.id)
             self.save()
-            logger.debug(f"已导入歌单: {playlist.name}")
+            logger.debug("已导入歌单: %s", playlist.name)
             return playlist
-        except Exception as e:
-            logger.error(f"导入歌单失败: {e}")
+        except Exception:
+            logger.exception("导入歌单失败")
             return None
 
     def search_playlists(self, keyword: str) -> List[Playlist]:
@@ -575,7 +845,7 @@ class Playlists:
             匹配的 Playlist 对象列表
         """
         keyword = keyword.lower()
-        return [pl for pl in self.get_all() if keyword in pl.name.lower()]
+        return [pl for pl in self._playlists.values() if keyword in pl._name_lower]
 
     def __repr__(self) -> str:
         return f"<Playlists: {self.get_count()} playlists>"
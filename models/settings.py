@@ -5,22 +5,23 @@
 """
 
 import logging
-from typing import Dict, Any, Optional
+from types import MappingProxyType
+from typing import Dict, Any, Mapping, Optional
 
 logger = logging.getLogger(__name__)
 
 class UserSettings:
     """用户设置管理器 - 提供默认值（实际存储在浏览器 localStorage）"""
     
-    # 默认设置
-    DEFAULT_SETTINGS = {
+    # 默认设置（只读视图，可直接共享给调用方，无需每次复制）
+    DEFAULT_SETTINGS = MappingProxyType({
         "theme": "dark",  # light / dark / auto
         "language": "auto",  # auto / zh / en
-    }
+    })
     
     def __init__(self):
         """初始化设置管理器"""
-        self.settings = self.DEFAULT_SETTINGS.copy()
+        self.settings = dict(self.DEFAULT_SETTINGS)
         logger.info("[设置] UserSettings 已初始化（使用默认值，实际存储在浏览器 localStorage）")
     
     def get(self, key: str, default: Any = None) -> Any:
@@ -39,22 +40,21 @@ class UserSettings:
     
     def update(self, settings_dict: Dict[str, Any]) -> bool:
         """批量更新设置（仅保存到内存）"""
-        valid_keys = set(self.DEFAULT_SETTINGS.keys())
-        for key, value in settings_dict.items():
-            if key in valid_keys:
-                self.settings[key] = value
-            else:
-                logger.warning(f"[设置] 忽略未知设置项: {key}")
+        valid_keys = self.DEFAULT_SETTINGS.keys()
+        self.settings.update({k: v for k, v in settings_dict.items() if k in valid_keys})
+        ignored = settings_dict.keys() - valid_keys
+        if ignored:
+            logger.warning(f"[设置] 忽略未知设置项: {', '.join(sorted(ignored))}")
         logger.info("[设置] 批量更新设置（存储在浏览器 localStorage）")
         return True
     
-    def get_all(self) -> Dict[str, Any]:
-        """获取所有默认设置"""
-        return self.DEFAULT_SETTINGS.copy()
+    def get_all(self) -> Mapping[str, Any]:
+        """获取所有默认设置（只读，需要修改时请自行 dict() 复制）"""
+        return self.DEFAULT_SETTINGS
     
     def reset(self):
         """重置为默认值"""
-        self.settings = self.DEFAULT_SETTINGS.copy()
+        self.settings = dict(self.DEFAULT_SETTINGS)
         logger.info("[设置] 已重置为默认值（请清空浏览器 localStorage 后重新加载）")
         return True
 
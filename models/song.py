@@ -4,17 +4,95 @@
 """
 
 import os
+import re
 import sys
+import threading
 import time
-from urllib.parse import urlparse, parse_qs
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from functools import lru_cache
+from urllib.parse import urlsplit
 from models.logger import logger
 
+# yt-dlp 导入时要注册上千个 extractor（冷启动约 200ms），在模块加载时完成而不是推迟到首次搜索
+try:
+    import yt_dlp
+except ImportError:
+    yt_dlp = None
+
+_YT_DLP_MISSING = {"status": "ERROR", "error": "yt-dlp 未安装"}
+
+# requests 仅用于探测 maxres 缩略图，缺失时视为没有 maxres
+try:
+    import requests
+except ImportError:
+    requests = None
+
+# YouTube 视频 ID：11 位 [0-9A-Za-z_-]，只认已知的链接形式：查询参数 v=/vi=、
+# /shorts/ /embed/ /v/ /vi/ /live/ 路径，以及 attribution_link 中 URL 编码的 v%3D；ID 后必须是分隔符或结尾
+_YT_ID_RE = re.compile(r"(?:[?&]vi?=|v%3[dD]|/(?:shorts|embed|v|vi|live)/)([0-9A-Za-z_-]{11})(?:[%#?&/]|$)")
+# youtu.be 短链：路径第一段就是 ID
+_YT_SHORT_PATH_RE = re.compile(r"/([0-9A-Za-z_-]{11})(?:[/?#]|$)")
+_YT_BARE_ID_RE = re.compile(r"[0-9A-Za-z_-]{11}")
+_YT_HOSTS = ("youtube.com", "youtube-nocookie.com")
+
+# YouTube 缩略图/观看地址前缀（拼接比逐次格式化 f-string 更省）
+_YT_THUMB_BASE = "https://img.youtube.com/vi/"
+_YT_WATCH_BASE = "https://www.youtube.com/watch?v="
+
+# YouTube 缩略图质量 -> 文件名: maxres (1280x720), sd (640x480), mq (320x180), default (120x90)
+_THUMBNAIL_QUALITIES = {
+    "maxres": "maxresdefault.jpg",
+    "sd": "sddefault.jpg",
+    "mq": "mqdefault.jpg",
+    "default": "default.jpg",
+}
+
+
+def _is_host(host: str, domain: str) -> bool:
+    """host 是否为 domain 或其子域名"""
+    return host == domain or host.endswith("." + domain)
+
+
+def _extract_video_id(url: str) -> str:
+    """从YouTube URL提取视频ID，兼容 watch/shorts/embed/live/youtu.be/nocookie/attribution_link 等链接"""
+    if not url:
+        return ""
+    # 已经是 11 位视频 ID
+    if len(url) == 11 and _YT_BARE_ID_RE.fullmatch(url):
+        return url
+    try:
+        # 兼容省略协议的链接（如 youtu.be/<id>）
+        parsed = urlsplit(url if "//" in url else "//" + url)
+        host = parsed.hostname or ""
+    except ValueError:
+        return ""
+
+    if _is_host(host, "youtu.be"):
+        m = _YT_SHORT_PATH_RE.match(parsed.path)
+    elif any(_is_host(host, domain) for domain in _YT_HOSTS):
+        m = _YT_ID_RE.search(url)
+    else:
+        return ""
+    return m.group(1) if m else ""
+
 
 class Song:
     """歌曲基类 - 可以是本地文件或串流媒体"""
 
+    # 固定字段使用 slots；保留 __dict__ 供播放历史附加 play_count/timestamps 等属性（按需才创建）
+    __slots__ = ("url", "title", "type", "duration", "timestamp", "thumbnail_url", "__dict__")
+
+    # 串流类型集合（哈希查找，不必每次调用都重建元组）
+    _STREAM_TYPES = frozenset(("youtube", "stream"))
+
     def __init__(
-        self, url: str, title: str = None, song_type: str = "local", duration: float = 0, thumbnail_url: str = None
+        self,
+        url: str,
+        title: str = None,
+        song_type: str = "local",
+        duration: float = 0,
+        thumbnail_url: str = None,
+        timestamp: int = None,
     ):
         """
         初始化歌曲对象
@@ -25,27 +103,24 @@ class Song:
           song_type: 歌曲类型 ('local' 或 'youtube')
           duration: 歌曲时长（秒）
           thumbnail_url: 缩略图URL（仅串流）
+          timestamp: 时间戳（默认为当前时间；批量创建时由调用方统一传入）
         """
         self.url = url
-        self.title = title or self._extract_title_from_url(url)
-        self.type = song_type
+        # 未提供标题时：串流媒体需要从API获取，先显示占位；本地文件使用文件名
+        self.title = title or ("加载中…" if song_type != "local" else os.path.basename(url))
+        # 类型取值只有少数几种，驻留后各实例共享同一字符串对象，比较时可直接按身份命中
+        self.type = sys.intern(song_type) if type(song_type) is str else song_type
         self.duration = duration
-        self.timestamp = int(time.time())
+        self.timestamp = int(time.time()) if timestamp is None else timestamp
         self.thumbnail_url = thumbnail_url
 
-    def _extract_title_from_url(self, url: str) -> str:
-        """从URL提取标题"""
-        if url.startswith("http"):
-            return "加载中…"
-        return os.path.basename(url)
-
     def is_local(self) -> bool:
         """是否为本地文件"""
         return self.type == "local"
 
     def is_stream(self) -> bool:
         """是否为串流媒体"""
-        return self.type in ("youtube", "stream")
+        return self.type in Song._STREAM_TYPES
 
     def to_dict(self) -> dict:
         """转换为字典"""
@@ -61,8 +136,13 @@ class Song:
         }
 
     @classmethod
-    def from_dict(cls, data: dict):
-        """从字典创建歌曲对象"""
+    def from_dict(cls, data: dict, timestamp: int = None):
+        """从字典创建歌曲对象
+
+        参数:
+          data: 歌曲字典
+          timestamp: 时间戳（批量创建时在循环外取一次当前时间传入）
+        """
         song_type = data.get("type", "local")
         # 根据类型创建相应的子类实例
         if song_type == "local":
@@ -70,6 +150,7 @@ class Song:
                 file_path=data.get("url", ""),
                 title=data.get("title"),
                 duration=data.get("duration", 0),
+                timestamp=timestamp,
             )
         else:
             return StreamSong(
@@ -78,8 +159,16 @@ class Song:
                 stream_type=song_type,
                 duration=data.get("duration", 0),
                 thumbnail_url=data.get("thumbnail_url"),
+                timestamp=timestamp,
             )
 
+    @classmethod
+    def from_dict_list(cls, items: list) -> list:
+        """批量从字典创建歌曲对象（共享同一个时间戳），非 dict 元素原样保留"""
+        now = int(time.time())
+        from_dict = cls.from_dict
+        return [from_dict(item, timestamp=now) if isinstance(item, dict) else item for item in items]
+
     def __repr__(self):
         return (
             f"Song(title='{self.title}', type='{self.type}', url='{self.url[:50]}...')"
@@ -89,7 +178,9 @@ class Song:
 class LocalSong(Song):
     """本地歌曲类 - 代表本地文件系统中的音乐文件"""
 
-    def __init__(self, file_path: str, title: str = None, duration: float = 0):
+    __slots__ = ("file_path", "file_name", "file_extension")
+
+    def __init__(self, file_path: str, title: str = None, duration: float = 0, timestamp: int = None):
         """
         初始化本地歌曲对象
 
@@ -97,31 +188,33 @@ class LocalSong(Song):
           file_path: 本地文件路径（相对或绝对路径）
           title: 歌曲标题（如果为空，从文件名提取）
           duration: 歌曲时长（秒）
+          timestamp: 时间戳（默认为当前时间）
         """
+        # 文件名/扩展名只解析一次，同时用作默认标题
+        file_name = os.path.basename(file_path)
+        name_without_ext, ext = os.path.splitext(file_name)
         super().__init__(
-            url=file_path, title=title, song_type="local", duration=duration
+            url=file_path, title=title or name_without_ext, song_type="local", duration=duration, timestamp=timestamp
         )
         self.file_path = file_path
-        self.file_name = os.path.basename(file_path)
-        self.file_extension = os.path.splitext(file_path)[1].lower()
+        self.file_name = file_name
+        self.file_extension = ext.lower()
 
-    def _extract_title_from_url(self, url: str) -> str:
-        """从文件路径提取标题"""
-        filename = os.path.basename(url)
-        # 去除文件扩展名
-        name_without_ext = os.path.splitext(filename)[0]
-        return name_without_ext
+    def _stat(self):
+        """对文件执行一次 stat，文件不存在或无法访问时返回 None"""
+        try:
+            return os.stat(self.file_path)
+        except (OSError, ValueError, TypeError):
+            return None
 
     def exists(self) -> bool:
         """检查文件是否存在"""
-        return os.path.exists(self.file_path)
+        return self._stat() is not None
 
     def get_file_size(self) -> int:
-        """获取文件大小（字节）"""
-        try:
-            return os.path.getsize(self.file_path) if self.exists() else 0
-        except Exception:
-            return 0
+        """获取文件大小（字节），一次 stat 同时完成存在性检查"""
+        st = self._stat()
+        return st.st_size if st else 0
 
     def get_absolute_path(self, base_dir: str = None) -> str:
         """获取绝对路径"""
@@ -190,6 +283,8 @@ class LocalSong(Song):
 class StreamSong(Song):
     """串流歌曲类 - 代表在线串流媒体（如YouTube）"""
 
+    __slots__ = ("stream_url", "stream_type", "video_id", "_is_youtube", "_thumbnails")
+
     def __init__(
         self,
         stream_url: str,
@@ -197,6 +292,7 @@ class StreamSong(Song):
         stream_type: str = "youtube",
         duration: float = 0,
         thumbnail_url: str = None,
+        timestamp: int = None,
     ):
         """
         初始化串流歌曲对象
@@ -207,89 +303,70 @@ class StreamSong(Song):
           stream_type: 串流类型 ('youtube', 'stream' 等)
           duration: 歌曲时长（秒）
           thumbnail_url: 缩略图URL（可选）
+          timestamp: 时间戳（默认为当前时间）
         """
         self.stream_url = stream_url
         self.stream_type = stream_type
         self.video_id = self._extract_video_id(stream_url)
-        
-        # 如果没有提供thumbnail_url，会自动计算高质量缩略图
+        # 串流属性在构造后不会改变，预先计算供 is_youtube/get_thumbnail_url/to_dict 直接使用
+        self._is_youtube = stream_type == "youtube" or "youtube" in stream_url.casefold()
+        if self._is_youtube and self.video_id:
+            self._thumbnails = {
+                quality: _YT_THUMB_BASE + self.video_id + "/" + name
+                for quality, name in _THUMBNAIL_QUALITIES.items()
+            }
+        else:
+            self._thumbnails = {}
+
+        # 如果没有提供thumbnail_url，直接取预先计算好的 sddefault 缩略图（可靠性高于 maxres）；
+        # stream 类型的 YouTube 链接同样适用；非 YouTube 串流没有预计算的缩略图，为空字符串
         if not thumbnail_url:
-            if stream_type == "youtube" and self.video_id:
-                thumbnail_url = self._get_hq_thumbnail_url(self.video_id)
-        
+            thumbnail_url = self._thumbnails.get("sd", "")
+
         super().__init__(
-            url=stream_url, title=title, song_type=stream_type, duration=duration, thumbnail_url=thumbnail_url
+            url=stream_url,
+            title=title,
+            song_type=stream_type,
+            duration=duration,
+            thumbnail_url=thumbnail_url,
+            timestamp=timestamp,
         )
 
-    def _extract_title_from_url(self, url: str) -> str:
-        """从URL提取标题（串流媒体需要从API获取）"""
-        return "加载中…"
-
     def _extract_video_id(self, url: str) -> str:
-        """从YouTube URL提取视频ID，兼容 watch/shorts/embed/youtu.be 链接"""
-        try:
-            parsed = urlparse(url)
-            host = (parsed.netloc or "").lower()
-            path = parsed.path or ""
-
-            # 标准 watch 链接
-            if "youtube.com" in host and "watch" in path:
-                return parse_qs(parsed.query).get("v", [""
-                ])[0] or ""
-
-            # shorts 链接: https://www.youtube.com/shorts/<id>
-            if "youtube.com" in host and path.startswith("/shorts/"):
-                return path.split("/shorts/")[1].split("/")[0].split("?")[0]
-
-            # embed 链接: https://www.youtube.com/embed/<id>
-            if "youtube.com" in host and path.startswith("/embed/"):
-                return path.split("/embed/")[1].split("/")[0].split("?")[0]
-
-            # youtu.be 短链: https://youtu.be/<id>
-            if "youtu.be" in host:
-                return path.lstrip("/").split("?")[0]
-
-        except Exception:
-            return ""
-
-        return ""
-
-    def _get_hq_thumbnail_url(self, video_id: str) -> str:
-        """
-        获取高质量YouTube缩略图URL
-        使用 sddefault (640x480) - 可靠性更高，避免 404 错误
-        前端会自动处理失败的URL降级到 mqdefault 或 default
-        """
-        if not video_id:
-            return ""
-        # 使用 sddefault (640x480) - 几乎所有视频都有此分辨率
-        # 避免 maxresdefault 的大量 404 错误
-        return f"https://img.youtube.com/vi/{video_id}/sddefault.jpg"
+        """从YouTube URL提取视频ID，兼容 watch/shorts/embed/youtu.be/nocookie/attribution_link 等链接"""
+        return _extract_video_id(url)
 
     def is_youtube(self) -> bool:
         """是否为YouTube视频"""
-        return self.stream_type == "youtube" or "youtube" in self.stream_url.lower()
+        return self._is_youtube
 
-    def get_thumbnail_url(self, quality: str = "maxres") -> str:
+    def get_thumbnail_url(self, quality: str = "best") -> str:
         """
         获取缩略图URL（仅YouTube）
-        质量选项: maxres (1280x720), sd (640x480), mq (320x180), default (120x90)
+        质量选项: best (当前已知最佳，见 best_thumbnail_url), maxres (1280x720), sd (640x480), mq (320x180),
+        default (120x90)
         """
-        if self.is_youtube() and self.video_id:
-            quality_map = {
-                "maxres": "maxresdefault.jpg",
-                "sd": "sddefault.jpg",
-                "mq": "mqdefault.jpg",
-                "default": "default.jpg",
-            }
-            quality_name = quality_map.get(quality, "maxresdefault.jpg")
-            return f"https://img.youtube.com/vi/{self.video_id}/{quality_name}"
-        return ""
+        thumbnails = self._thumbnails
+        if quality == "best":
+            return StreamSong.best_thumbnail_url(self.video_id) if thumbnails else ""
+        return thumbnails.get(quality) or thumbnails.get("maxres", "")
+
+    @staticmethod
+    def best_thumbnail_url(video_id: str) -> str:
+        """获取当前已知最佳的缩略图URL
+
+        并非所有视频都有 maxres；只有探测（见 probe_maxres）确认存在时才返回 maxres，
+        否则使用几乎总是存在的 sddefault。结果随探测缓存变化，调用方不应长期缓存。
+        """
+        if not video_id:
+            return ""
+        name = _THUMBNAIL_QUALITIES["maxres" if _maxres_available(video_id) else "sd"]
+        return _YT_THUMB_BASE + video_id + "/" + name
 
     def get_watch_url(self) -> str:
         """获取观看URL"""
-        if self.is_youtube() and self.video_id:
-            return f"https://www.youtube.com/watch?v={self.video_id}"
+        if self._is_youtube and self.video_id:
+            return _YT_WATCH_BASE + self.video_id
         return self.stream_url
 
     def play(
@@ -417,16 +494,17 @@ class StreamSong(Song):
             logger.error(f"❌ 堆栈:\n{traceback.format_exc()}")
             return False
 
-    def to_dict(self) -> dict:
-        """转换为字典"""
+    def to_dict(self, quality: str = None) -> dict:
+        """转换为字典
+
+        参数:
+          quality: 缩略图质量（maxres/sd/mq/default）；为空时使用歌曲自身的 thumbnail_url
+        """
         data = super().to_dict()
-        data.update(
-            {
-                "stream_type": self.stream_type,
-                "video_id": self.video_id,
-                "thumbnail_url": self.get_thumbnail_url(),
-            }
-        )
+        data["stream_type"] = self.stream_type
+        data["video_id"] = self.video_id
+        if quality:
+            data["thumbnail_url"] = self._thumbnails.get(quality) or self.thumbnail_url
         return data
 
     @staticmethod
@@ -443,55 +521,35 @@ class StreamSong(Song):
 
         if not query or not query.strip():
             return {"status": "ERROR", "error": "搜索关键字不能为空"}
+        if yt_dlp is None:
+            return dict(_YT_DLP_MISSING)
 
-        try:
-            import yt_dlp
+        # 单个 ASCII 字符（如输入框逐字触发的搜索）或不需要结果时，无需调用 yt-dlp；
+        # 单个中文字符仍是有意义的关键字，照常搜索
+        q = query.strip()
+        if max_results <= 0 or (len(q) < 2 and q.isascii()):
+            return {"status": "OK", "results": []}
 
+        try:
             logger.debug(f"搜索 YouTube: {query}")
 
             # 使用 yt-dlp 搜索 YouTube
             # ✅ 使用 extract_flat 模式快速获取搜索结果（包含 duration 字段）
-            ydl_opts = {
-                "quiet": True,
-                "no_warnings": True,
-                "default_search": "ytsearch",
-                "extract_flat": "in_playlist",  # 快速模式：只提取基本信息，避免下载完整格式列表
-                "skip_download": True,  # 明确不下载视频
-            }
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                # 搜索结果
-                result = ydl.extract_info(
-                    f"ytsearch{max_results}:{query}", download=False
-                )
-                results = []
-                if result and "entries" in result:
-                    for item in result["entries"][:max_results]:
-                        if item:
-                            video_id = item.get("id", "")
-                            duration = item.get("duration", 0)
-                            # 生成缩略图 URL（使用 sddefault 中等质量，前端会降级到 mqdefault/default）
-                            thumbnail_url = f"https://img.youtube.com/vi/{video_id}/sddefault.jpg" if video_id else ""
-                            
-                            results.append(
-                                {
-                                    "url": f"https://www.youtube.com/watch?v={video_id}",
-                                    "title": item.get("title", "Unknown"),
-                                    "duration": duration,
-                                    "uploader": item.get("uploader", "Unknown"),
-                                    "id": video_id,
-                                    "type": "youtube",
-                                    "thumbnail_url": thumbnail_url,
-                                }
-                            )
-                logger.info(f"[YouTube搜索] 搜索完成，找到 {len(results)} 个结果")
-                return {"status": "OK", "results": results}
+            ydl = _get_ydl({**_FLAT_OPTS, "default_search": "ytsearch"})
+            # 搜索结果
+            result = ydl.extract_info(
+                f"ytsearch{max_results}:{query}", download=False
+            )
+            results = []
+            if result and "entries" in result:
+                results = [_entry_to_dict(item) for item in result["entries"] if item]
+            logger.info(f"[YouTube搜索] 搜索完成，找到 {len(results)} 个结果")
+            return {"status": "OK", "results": results}
         except Exception as e:
-            logger.error(f"YouTube 搜索失败: {str(e)}")
-            import traceback
-
-            traceback.print_exc()
+            logger.exception("YouTube 搜索失败")
             return {"status": "ERROR", "error": f"搜索失败: {str(e)}"}
 
+    @staticmethod
     def extract_playlist(url: str, max_results: int = 10) -> dict:
         """提取 YouTube 播放列表中的视频
 
@@ -502,98 +560,7 @@ class StreamSong(Song):
         返回:
           {'status': 'OK'/'ERROR', 'entries': [...]} 或 {'status': 'ERROR', 'error': '错误信息'}
         """
-        if not url or not url.strip():
-            return {"status": "ERROR", "error": "播放列表 URL 不能为空"}
-
-        try:
-            import yt_dlp
-
-            logger.debug(f"提取播放列表: {url}")
-
-            # 使用 yt-dlp 提取播放列表
-            ydl_opts = {
-                "quiet": True,
-                "no_warnings": True,
-                "extract_flat": True,
-                "skip_download": True,
-                "ignoreerrors": True,
-                "playliststart": 1,
-                "playlistend": max_results,  # 只下载前 max_results 个
-            }
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                result = ydl.extract_info(url, download=False)
-
-                logger.debug(f"提取结果类型: {type(result)}")
-                if result:
-                    print(
-                        f"[DEBUG] 结果包含键: {result.keys() if isinstance(result, dict) else 'N/A'}"
-                    )
-
-                entries = []
-
-                if result and "entries" in result:
-                    logger.debug(f"找到 entries，共 {len(result['entries'])} 项")
-                    for idx, item in enumerate(result["entries"]):
-                        if not item:
-                            logger.warning(f"第 {idx} 项为空，跳过")
-                            continue
-
-                        print(
-                            f"[DEBUG] 处理第 {idx} 项: {item.keys() if isinstance(item, dict) else type(item)}"
-                        )
-
-                        # 获取视频 ID
-                        video_id = item.get("id") or item.get("video_id")
-                        entry_url = item.get("url")
-
-                        # 构建完整的 YouTube URL
-                        if video_id:
-                            entry_url = f"https://www.youtube.com/watch?v={video_id}"
-                        elif entry_url and not entry_url.startswith("http"):
-                            # 可能是相对 URL 或 ID
-                            if len(entry_url) == 11:  # 标准 YouTube 视频 ID 长度
-                                entry_url = (
-                                    f"https://www.youtube.com/watch?v={entry_url}"
-                                )
-
-                        if not entry_url:
-                            logger.warning(f"第 {idx} 项无法获取 URL，跳过")
-                            continue
-
-                        title = item.get("title") or "未知标题"
-                        duration = item.get("duration", 0)
-                        
-                        # 生成缩略图 URL（使用 sddefault 中等质量，前端会降级到 mqdefault/default）
-                        thumbnail_url = f"https://img.youtube.com/vi/{video_id}/sddefault.jpg" if video_id else ""
-
-                        logger.debug(f"添加视频: {title} - {entry_url}")
-
-                        entries.append(
-                            {
-                                "url": entry_url,
-                                "title": title,
-                                "id": video_id or "",
-                                "duration": duration,
-                                "type": "youtube",
-                                "thumbnail_url": thumbnail_url,
-                                "uploader": item.get("uploader", "Unknown"),
-                            }
-                        )
-
-                    logger.debug(f"成功提取 {len(entries)} 个视频")
-                    if len(entries) > 0:
-                        return {"status": "OK", "entries": entries}
-                    else:
-                        return {"status": "ERROR", "error": "播放列表中没有有效的视频"}
-                else:
-                    logger.warning(f"结果中没有 entries 字段")
-                    return {"status": "ERROR", "error": "播放列表为空或无法解析"}
-        except Exception as e:
-            logger.error(f"提取播放列表失败: {str(e)}")
-            import traceback
-
-            traceback.print_exc()
-            return {"status": "ERROR", "error": f"提取播放列表失败: {str(e)}"}
+        return _extract_playlist(url, max_results)
 
     @staticmethod
     def extract_metadata(url: str) -> dict:
@@ -607,53 +574,331 @@ class StreamSong(Song):
         """
         if not url or not url.strip():
             return {"status": "ERROR", "error": "视频 URL 不能为空"}
+        if yt_dlp is None:
+            return dict(_YT_DLP_MISSING)
 
         try:
-            import yt_dlp
+            # 能识别出视频 ID 的链接按 ID 缓存，不同形式的同一视频链接共享缓存
+            video_id = _extract_video_id(url)
+            data = dict(_fetch_metadata_by_id(video_id) if video_id else _fetch_metadata(url))
+            logger.debug("元数据缓存: %s", _fetch_metadata_by_id.cache_info())
+            # 缓存的缩略图是首次获取时的结果，按最新的 maxres 探测结果重新生成
+            if data.get("id"):
+                data["thumbnail_url"] = StreamSong.best_thumbnail_url(data["id"])
+            return {"status": "OK", "data": data}
+        except _MetadataUnavailable:
+            return {"status": "ERROR", "error": "无法获取视频信息"}
+        except Exception as e:
+            logger.exception("提取视频元数据失败")
+            return {"status": "ERROR", "error": f"提取视频元数据失败: {str(e)}"}
 
-            logger.debug(f"提取视频元数据: {url}")
+    @staticmethod
+    def clear_metadata_cache():
+        """清空 extract_metadata 的元数据缓存"""
+        _fetch_metadata_by_id.cache_clear()
 
-            # 使用 yt-dlp 提取视频信息
-            ydl_opts = {
-                "quiet": False,
-                "no_warnings": False,
-                "skip_download": True,
-                "ignoreerrors": True,
-            }
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                result = ydl.extract_info(url, download=False)
+    @staticmethod
+    def metadata_cache_info():
+        """获取 extract_metadata 元数据缓存的命中统计（functools 的 CacheInfo）"""
+        return _fetch_metadata_by_id.cache_info()
 
-                if result:
-                    video_id = result.get("id") or result.get("video_id")
-                    title = result.get("title", "Unknown")
-                    duration = result.get("duration", 0)
-                    
-                    # 生成缩略图 URL（使用 sddefault 中等质量，前端会降级到 mqdefault/default）
-                    thumbnail_url = f"https://img.youtube.com/vi/{video_id}/sddefault.jpg" if video_id else ""
-                    
-                    # 构建完整的 YouTube URL
-                    entry_url = f"https://www.youtube.com/watch?v={video_id}" if video_id else url
-                    
-                    return {
-                        "status": "OK",
-                        "data": {
-                            "url": entry_url,
-                            "title": title,
-                            "duration": duration,
-                            "uploader": result.get("uploader", "Unknown"),
-                            "id": video_id,
-                            "type": "youtube",
-                            "thumbnail_url": thumbnail_url,
-                        }
-                    }
-                else:
-                    return {"status": "ERROR", "error": "无法获取视频信息"}
-        except Exception as e:
-            logger.error(f"提取视频元数据失败: {str(e)}")
-            import traceback
+    @staticmethod
+    def extract_metadata_bulk(urls: list, timeout: float = 300) -> list:
+        """并行提取多个 YouTube 视频的元数据
 
-            traceback.print_exc()
-            return {"status": "ERROR", "error": f"提取视频元数据失败: {str(e)}"}
+        每个视频的提取都是网络 I/O（期间释放 GIL），在常驻线程池中并发执行以重叠等待时间，
+        最大并发数为 _METADATA_WORKERS。
+
+        参数:
+          urls: 视频 URL 列表
+          timeout: 等待每个视频结果的超时时间（秒）。超时的项返回 ERROR；
+            尚未开始的提取会被取消，已在执行的提取无法中断，会在线程池中继续运行直到结束
+
+        返回:
+          与 urls 顺序一致的结果列表，每项格式同 extract_metadata
+        """
+        if not urls:
+            return []
+
+        # 使用常驻线程池：各工作线程缓存的 YoutubeDL 实例（见 _get_ydl）可跨批次复用
+        executor = _shared_executor("yt-metadata", _METADATA_WORKERS)
+        futures = [executor.submit(StreamSong.extract_metadata, url) for url in urls]
+        results = []
+        for url, future in zip(urls, futures):
+            try:
+                results.append(future.result(timeout=timeout))
+            except FutureTimeoutError:
+                logger.warning(f"提取视频元数据超时（{timeout}秒），跳过: {url}")
+                future.cancel()
+                results.append({"status": "ERROR", "error": "提取视频元数据超时"})
+        return results
 
     def __repr__(self):
         return f"StreamSong(title='{self.title}', type='{self.stream_type}', id='{self.video_id}')"
+
+
+# ==================== yt-dlp 实例复用 ====================
+
+# YoutubeDL 构造时要注册上千个 extractor，开销很大；不下载时实例可重复使用。
+# YoutubeDL 不是线程安全的（extract_metadata_bulk 会并发调用），因此按线程各自缓存。
+_YDL_LOCAL = threading.local()
+
+
+def _get_ydl(opts: dict):
+    """获取当前线程中与 opts 对应的 YoutubeDL 实例（首次使用时创建）"""
+    pool = getattr(_YDL_LOCAL, "pool", None)
+    if pool is None:
+        pool = _YDL_LOCAL.pool = {}
+    key = repr(sorted(opts.items()))
+    ydl = pool.get(key)
+    if ydl is None:
+        if yt_dlp is None:
+            raise ImportError("yt-dlp 未安装")
+        ydl = pool[key] = yt_dlp.YoutubeDL(opts)
+    return ydl
+
+
+_EXECUTORS = {}
+_EXECUTORS_LOCK = threading.Lock()
+_METADATA_WORKERS = 8  # extract_metadata_bulk 的最大并发数
+
+
+def _shared_executor(name: str, max_workers: int) -> ThreadPoolExecutor:
+    """获取按名称共享的常驻线程池（首次使用时创建，max_workers 仅在创建时生效）"""
+    with _EXECUTORS_LOCK:
+        executor = _EXECUTORS.get(name)
+        if executor is None:
+            executor = _EXECUTORS[name] = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        return executor
+
+
+# ==================== yt-dlp 条目转换 ====================
+
+
+def _entry_to_dict(item: dict, fallback_url: str = None, default_title: str = "Unknown") -> dict:
+    """将 yt-dlp 返回的条目（搜索结果、播放列表项或单个视频信息）转换为统一的视频字典
+
+    参数:
+      item: yt-dlp 条目
+      fallback_url: 条目没有视频 ID 时使用的 URL（默认使用条目自身的 url 字段）
+      default_title: 条目没有标题时使用的标题
+
+    返回:
+      {'url', 'title', 'duration', 'uploader', 'id', 'type', 'thumbnail_url'}，无法确定 URL 时 url 为空字符串
+    """
+    video_id = item.get("id") or item.get("video_id") or ""
+    if video_id:
+        # 构建完整的 YouTube URL；缩略图取已知最佳质量（未探测时为 sddefault，前端会降级到 mqdefault/default）
+        url = _YT_WATCH_BASE + video_id
+        thumbnail_url = StreamSong.best_thumbnail_url(video_id)
+    else:
+        url = (fallback_url if fallback_url is not None else item.get("url")) or ""
+        thumbnail_url = ""
+    return {
+        "url": url,
+        "title": item.get("title") or default_title,
+        "duration": item.get("duration", 0),
+        "uploader": item.get("uploader", "Unknown"),
+        "id": video_id,
+        "type": "youtube",
+        "thumbnail_url": thumbnail_url,
+    }
+
+
+# ==================== 播放列表（yt-dlp） ====================
+
+# 搜索/播放列表共用的快速模式参数：只提取条目基本信息（含 duration），不解析格式列表，
+# 并跳过 HLS/DASH 清单和翻译字幕的请求
+_FLAT_OPTS = {
+    "quiet": True,
+    "no_warnings": True,
+    "extract_flat": "in_playlist",
+    "skip_download": True,
+    "extractor_args": {"youtube": {"skip": ["hls", "dash", "translated_subs"]}},
+}
+
+
+def _extract_playlist(url: str, max_results: int = 10) -> dict:
+    """StreamSong.extract_playlist 的实现（参数与返回值见该方法）"""
+    if not url or not url.strip():
+        return {"status": "ERROR", "error": "播放列表 URL 不能为空"}
+    if yt_dlp is None:
+        return dict(_YT_DLP_MISSING)
+
+    try:
+        result = _fetch_playlist(url, max_results)
+        if not result or "entries" not in result:
+            logger.warning(f"结果中没有 entries 字段")
+            return {"status": "ERROR", "error": "播放列表为空或无法解析"}
+
+        entries = list(_iter_playlist_entries(result["entries"]))
+        # 后台探测 maxres 缩略图（不阻塞本次请求），之后的结果可直接给出高清地址
+        prewarm_maxres([entry["id"] for entry in entries])
+        logger.debug("成功提取 %d 个视频", len(entries))
+        if len(entries) > 0:
+            return {"status": "OK", "entries": entries}
+        else:
+            return {"status": "ERROR", "error": "播放列表中没有有效的视频"}
+    except Exception as e:
+        logger.exception("提取播放列表失败")
+        return {"status": "ERROR", "error": f"提取播放列表失败: {str(e)}"}
+
+
+def _fetch_playlist(url: str, max_results: int):
+    """通过 yt-dlp 以 extract_flat 模式获取播放列表的原始信息"""
+    logger.debug(f"提取播放列表: {url}")
+
+    # 使用 yt-dlp 提取播放列表
+    ydl_opts = {
+        **_FLAT_OPTS,
+        "ignoreerrors": True,  # 跳过播放列表中不可用的视频；搜索不设置，失败时要报告 ERROR
+        "playliststart": 1,
+        "playlistend": max_results,  # 只下载前 max_results 个
+    }
+    ydl = _get_ydl(ydl_opts)
+    result = ydl.extract_info(url, download=False)
+
+    logger.debug("提取结果类型: %s", type(result))
+    if isinstance(result, dict):
+        logger.debug("结果包含键: %s", result.keys())
+    return result
+
+
+def _iter_playlist_entries(items):
+    """将 yt-dlp 返回的播放列表条目逐个转换为视频字典，跳过无效项"""
+    for idx, item in enumerate(items):
+        if not item:
+            logger.warning(f"第 {idx} 项为空，跳过")
+            continue
+
+        logger.debug("处理第 %d 项: %s", idx, item.get("id") or item.get("url"))
+
+        # 没有视频 ID 时使用条目自身的 url；它可能是相对 URL 或 11 位的视频 ID
+        entry_url = item.get("url")
+        if entry_url and not entry_url.startswith("http") and len(entry_url) == 11:
+            entry_url = _YT_WATCH_BASE + entry_url
+
+        entry = _entry_to_dict(item, fallback_url=entry_url, default_title="未知标题")
+        if not entry["url"]:
+            logger.warning(f"第 {idx} 项无法获取 URL，跳过")
+            continue
+
+        logger.debug("添加视频: %s - %s", entry["title"], entry["url"])
+        yield entry
+
+
+# ==================== maxres 缩略图探测 ====================
+
+# video_id -> (是否存在 maxresdefault.jpg, 探测时间)；结果在 TTL 内有效，最多保留 _MAXRES_MAX 项
+_MAXRES_CACHE = {}
+_MAXRES_TTL = 86400
+_MAXRES_MAX = 8192
+_MAXRES_WORKERS = 8
+_MAXRES_LOCK = threading.Lock()
+
+
+def _maxres_cached(video_id: str):
+    """返回未过期的探测结果（True/False），未探测或已过期时返回 None（过期项顺便移除）"""
+    cached = _MAXRES_CACHE.get(video_id)
+    if not cached:
+        return None
+    if time.time() - cached[1] < _MAXRES_TTL:
+        return cached[0]
+    _MAXRES_CACHE.pop(video_id, None)
+    return None
+
+
+def _maxres_store(video_id: str, available: bool):
+    """写入探测结果；缓存已满时先清理过期项，仍然满则按写入顺序淘汰最旧的项"""
+    with _MAXRES_LOCK:
+        if len(_MAXRES_CACHE) >= _MAXRES_MAX:
+            now = time.time()
+            expired = [vid for vid, (_, ts) in _MAXRES_CACHE.items() if now - ts >= _MAXRES_TTL]
+            for vid in expired:
+                _MAXRES_CACHE.pop(vid, None)
+            while len(_MAXRES_CACHE) >= _MAXRES_MAX:
+                _MAXRES_CACHE.pop(next(iter(_MAXRES_CACHE)), None)
+        # 先删除再插入，使重新探测的项移到末尾（最新）
+        _MAXRES_CACHE.pop(video_id, None)
+        _MAXRES_CACHE[video_id] = (available, time.time())
+
+
+def _maxres_available(video_id: str) -> bool:
+    """根据探测缓存判断视频是否有 maxres 缩略图（未探测或已过期视为没有）"""
+    return _maxres_cached(video_id) is True
+
+
+def probe_maxres(video_id: str, timeout: float = 5) -> bool:
+    """对 maxresdefault.jpg 发起 HEAD 请求，判断并缓存该视频是否有 maxres 缩略图
+
+    参数:
+      video_id: YouTube 视频 ID
+      timeout: 请求超时时间（秒）
+
+    返回:
+      是否存在 maxres 缩略图；网络错误时返回 False 且不写入缓存
+    """
+    if not video_id:
+        return False
+    cached = _maxres_cached(video_id)
+    if cached is not None:
+        return cached
+    if requests is None:
+        return False
+
+    try:
+        resp = requests.head(_YT_THUMB_BASE + video_id + "/" + _THUMBNAIL_QUALITIES["maxres"], timeout=timeout)
+    except requests.RequestException as e:
+        logger.debug("探测 maxres 缩略图失败 %s: %s", video_id, e)
+        return False
+    available = resp.status_code == 200
+    _maxres_store(video_id, available)
+    return available
+
+
+def prewarm_maxres(video_ids: list):
+    """在后台线程池中批量探测 maxres 缩略图，立即返回不等待探测完成
+
+    参数:
+      video_ids: YouTube 视频 ID 列表（空 ID 和缓存未过期的 ID 会被跳过）
+    """
+    pending = [vid for vid in dict.fromkeys(video_ids) if vid and _maxres_cached(vid) is None]
+    if not pending or requests is None:
+        return
+    executor = _shared_executor("maxres-probe", _MAXRES_WORKERS)
+    for vid in pending:
+        executor.submit(probe_maxres, vid)
+
+
+# ==================== 视频元数据（yt-dlp） ====================
+
+
+class _MetadataUnavailable(Exception):
+    """yt-dlp 未返回视频信息"""
+
+
+def _fetch_metadata(url: str) -> dict:
+    """通过 yt-dlp 获取单个视频的元数据，无结果时抛出 _MetadataUnavailable"""
+    logger.debug(f"提取视频元数据: {url}")
+
+    # 使用 yt-dlp 提取视频信息
+    ydl_opts = {
+        "quiet": False,
+        "no_warnings": False,
+        "skip_download": True,
+        "ignoreerrors": True,
+    }
+    ydl = _get_ydl(ydl_opts)
+    result = ydl.extract_info(url, download=False)
+
+    if not result:
+        raise _MetadataUnavailable(url)
+
+    return _entry_to_dict(result, fallback_url=url)
+
+
+@lru_cache(maxsize=4096)
+def _fetch_metadata_by_id(video_id: str) -> dict:
+    """按视频 ID 获取元数据并缓存（失败会抛出异常，因此不会被缓存）"""
+    return _fetch_metadata(_YT_WATCH_BASE + video_id)
+
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Playlist 去重索引测试
+
+用途：验证重复歌曲（旧数据、外部直接修改 songs）下 add_song / add_songs / remove_song 的行为
+"""
+
+from models.playlists import Playlist
+
+
+def make_playlist():
+    return Playlist(songs=["a.mp3", "b.mp3", "a.mp3", {"url": "u1"}, {"url": "u1"}])
+
+
+def test_remove_song_removes_every_duplicate_path():
+    pl = make_playlist()
+    assert pl.remove_song("a.mp3")
+    assert pl.remove_song("a.mp3")
+    assert not pl.remove_song("a.mp3")
+    assert "a.mp3" not in pl.songs
+
+
+def test_duplicate_url_still_blocks_add_after_one_copy_removed():
+    pl = make_playlist()
+    assert pl.remove_song_at_index(3) == {"url": "u1"}
+    assert not pl.add_song({"url": "u1"})
+    assert pl.remove_song_at_index(3) == {"url": "u1"}
+    assert pl.add_song({"url": "u1"})
+
+
+def test_external_insert_is_indexed():
+    pl = Playlist(songs=["a.mp3"])
+    pl.songs.insert(0, "a.mp3")
+    assert pl.remove_song("a.mp3")
+    assert not pl.add_song("a.mp3")
+
+
+def test_remove_song_accepts_song_dict():
+    pl = make_playlist()
+    assert pl.remove_song({"url": "u1", "title": "x"})
+    assert not pl.remove_song({"title": "no url"})
+    assert not pl.remove_song(["unhashable"])
+
+
+def test_add_songs_matches_repeated_add_song():
+    batch = ["c.mp3", {"url": "u2"}, "c.mp3", "a.mp3", {"url": "u2", "title": "dup"}, "d.mp3"]
+    one_by_one = make_playlist()
+    expected = sum(one_by_one.add_song(item) for item in batch)
+    pl = make_playlist()
+    assert pl.add_songs(batch) == expected == 3
+    assert list(pl.songs) == list(one_by_one.songs)
+    assert not pl.add_song("d.mp3")
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Playlists 管理器测试
+
+用途：验证歌单文件的加载（顺序、默认歌单、缩略图补全）、batch() 与批量添加的合并写入
+"""
+
+import json
+
+import pytest
+
+from models import playlists as playlists_module
+from models.playlists import DEFAULT_PLAYLIST_ID, Playlists
+
+YT_URL = "https://www.youtube.com/watch?v=dQw4w9WgXcQ"
+
+
+@pytest.fixture
+def data_file(tmp_path):
+    path = tmp_path / "playlists.json"
+    path.write_text(
+        json.dumps(
+            {
+                "order": ["b"],
+                "playlists": [
+                    {"id": "a", "name": "A", "songs": [{"url": YT_URL, "type": "stream"}]},
+                    {"id": "b", "name": "B", "songs": ["x.mp3"]},
+                ],
+            }
+        ),
+        encoding="utf-8",
+    )
+    return str(path)
+
+
+def test_load_keeps_saved_order_and_adds_default(data_file):
+    manager = Playlists(data_file)
+    assert [pl.id for pl in manager.get_all()] == [DEFAULT_PLAYLIST_ID, "b", "a"]
+
+
+def test_load_hydrates_legacy_stream_thumbnails_before_returning(data_file):
+    manager = Playlists(data_file)
+    song = manager.get_playlist("a").songs[0]
+    assert song["thumbnail_url"].endswith("/sddefault.jpg")
+    with open(data_file, encoding="utf-8") as f:
+        saved = json.load(f)
+    assert saved["playlists"][2]["songs"][0]["thumbnail_url"] == song["thumbnail_url"]
+
+
+@pytest.fixture
+def count_writes(monkeypatch):
+    writes = []
+    real_write = playlists_module._atomic_write_bytes
+
+    def counting_write(path, payload):
+        writes.append(path)
+        real_write(path, payload)
+
+    monkeypatch.setattr(playlists_module, "_atomic_write_bytes", counting_write)
+    return writes
+
+
+def test_batch_writes_once(data_file, count_writes):
+    manager = Playlists(data_file)
+    count_writes.clear()
+    with manager.batch():
+        created = manager.create_playlist("one")
+        manager.rename_playlist(created.id, "uno")
+        manager.rename_playlist("b", "bee")
+        assert count_writes == []
+    assert count_writes == [data_file]
+    assert [pl.name for pl in Playlists(data_file).get_all()][1:] == ["bee", "A", "uno"]
+
+
+def test_nested_batch_writes_once_on_outermost_exit(data_file, count_writes):
+    manager = Playlists(data_file)
+    count_writes.clear()
+    with manager.batch():
+        with manager.batch():
+            manager.create_playlist("inner")
+        assert count_writes == []
+        manager.create_playlist("outer")
+    assert count_writes == [data_file]
+
+
+def test_batch_without_changes_does_not_write(data_file, count_writes):
+    manager = Playlists(data_file)
+    count_writes.clear()
+    with manager.batch():
+        pass
+    assert count_writes == []
+
+
+def test_add_songs_to_playlist_writes_once(data_file, count_writes):
+    manager = Playlists(data_file)
+    count_writes.clear()
+    assert manager.add_songs_to_playlist("b", ["y.mp3", "x.mp3", "z.mp3", "y.mp3"]) == 2
+    assert count_writes == [data_file]
+    assert list(Playlists(data_file).get_playlist("b").songs) == ["z.mp3", "y.mp3", "x.mp3"]
+    assert manager.add_songs_to_playlist("b", ["x.mp3"]) == 0
+    assert manager.add_songs_to_playlist("missing", ["y.mp3"]) == 0
+    assert count_writes == [data_file]
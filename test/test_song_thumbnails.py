@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+串流歌曲缩略图测试
+
+用途：验证缩略图质量选项、maxres 探测缓存的使用与容量限制
+"""
+
+import time
+
+import pytest
+
+from models import song
+from models.song import StreamSong
+
+VIDEO_ID = "dQw4w9WgXcQ"
+URL = f"https://www.youtube.com/watch?v={VIDEO_ID}"
+
+
+@pytest.fixture(autouse=True)
+def clean_maxres_cache():
+    song._MAXRES_CACHE.clear()
+    yield
+    song._MAXRES_CACHE.clear()
+
+
+def test_maxres_quality_is_literal():
+    assert StreamSong(URL).get_thumbnail_url("maxres").endswith("/maxresdefault.jpg")
+
+
+def test_best_quality_follows_probe_cache():
+    s = StreamSong(URL)
+    assert s.get_thumbnail_url().endswith("/sddefault.jpg")
+    song._maxres_store(VIDEO_ID, True)
+    assert s.get_thumbnail_url().endswith("/maxresdefault.jpg")
+
+
+def test_expired_probe_result_is_evicted_on_read():
+    song._MAXRES_CACHE[VIDEO_ID] = (True, time.time() - song._MAXRES_TTL - 1)
+    assert StreamSong(URL).get_thumbnail_url().endswith("/sddefault.jpg")
+    assert VIDEO_ID not in song._MAXRES_CACHE
+
+
+def test_probe_cache_is_bounded(monkeypatch):
+    monkeypatch.setattr(song, "_MAXRES_MAX", 3)
+    for i in range(5):
+        song._maxres_store(f"video{i:06d}", True)
+    assert list(song._MAXRES_CACHE) == ["video000002", "video000003", "video000004"]
+
+
+def test_stream_typed_youtube_song_gets_default_thumbnail():
+    assert StreamSong(URL, stream_type="stream").to_dict()["thumbnail_url"].endswith("/sddefault.jpg")
+    assert StreamSong("http://radio.example.com/live", stream_type="stream").to_dict()["thumbnail_url"] == ""
+
+
+def test_extract_metadata_refreshes_cached_thumbnail(monkeypatch):
+    calls = []
+
+    def fake_fetch(url):
+        calls.append(url)
+        return song._entry_to_dict({"id": VIDEO_ID, "title": "t"}, fallback_url=url)
+
+    monkeypatch.setattr(song, "yt_dlp", object())
+    monkeypatch.setattr(song, "_fetch_metadata", fake_fetch)
+    StreamSong.clear_metadata_cache()
+    try:
+        first = StreamSong.extract_metadata(URL)["data"]
+        assert first["thumbnail_url"].endswith("/sddefault.jpg")
+        song._maxres_store(VIDEO_ID, True)
+        second = StreamSong.extract_metadata(f"https://youtu.be/{VIDEO_ID}")["data"]
+        assert second["thumbnail_url"].endswith("/maxresdefault.jpg")
+        assert len(calls) == 1
+        assert StreamSong.metadata_cache_info().hits == 1
+    finally:
+        StreamSong.clear_metadata_cache()
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+YouTube 视频 ID 解析测试
+
+用途：验证 _extract_video_id 支持的各种链接形式，以及对非视频链接/非 YouTube 域名不误识别
+"""
+
+import pytest
+
+from models.song import _extract_video_id
+
+VIDEO_ID = "dQw4w9WgXcQ"
+
+
+@pytest.mark.parametrize(
+    "url",
+    [
+        VIDEO_ID,
+        f"https://www.youtube.com/watch?v={VIDEO_ID}",
+        f"https://www.youtube.com/watch?feature=share&v={VIDEO_ID}&t=42",
+        f"https://m.youtube.com/watch?v={VIDEO_ID}",
+        f"https://music.youtube.com/watch?v={VIDEO_ID}&list=RDAMVM",
+        f"https://www.youtube.com/watch?vi={VIDEO_ID}",
+        f"https://www.youtube.com/shorts/{VIDEO_ID}",
+        f"https://www.youtube.com/shorts/{VIDEO_ID}?feature=share",
+        f"https://www.youtube.com/embed/{VIDEO_ID}?autoplay=1",
+        f"https://www.youtube-nocookie.com/embed/{VIDEO_ID}",
+        f"https://www.youtube.com/v/{VIDEO_ID}",
+        f"https://www.youtube.com/live/{VIDEO_ID}",
+        f"https://youtu.be/{VIDEO_ID}",
+        f"https://youtu.be/{VIDEO_ID}?t=10",
+        f"youtu.be/{VIDEO_ID}",
+        f"www.youtube.com/watch?v={VIDEO_ID}",
+        f"https://WWW.YOUTUBE.COM/watch?v={VIDEO_ID}",
+        f"https://Youtu.be/{VIDEO_ID}",
+        f"HTTPS://M.YouTube.com/shorts/{VIDEO_ID}",
+        f"https://www.youtube.com/attribution_link?a=abc&u=%2Fwatch%3Fv%3D{VIDEO_ID}%26feature%3Dshare",
+    ],
+)
+def test_extracts_id_from_known_link_shapes(url):
+    assert _extract_video_id(url) == VIDEO_ID
+
+
+@pytest.mark.parametrize(
+    "url",
+    [
+        "",
+        "https://www.youtube.com/user/abcdefghijk",
+        "https://www.youtube.com/c/abcdefghijk/videos",
+        "https://www.youtube.com/@abcdefghijk",
+        "https://www.youtube.com/playlist?list=PLabcdefghijk",
+        "https://www.youtube.com/watch?v=tooShort",
+        f"https://notyoutube.com/watch?v={VIDEO_ID}",
+        f"https://example.com/youtube/v/{VIDEO_ID}",
+        f"https://youtu.be.example.com/{VIDEO_ID}",
+        "http://radio.example.com/stream.mp3",
+        "music/local/song.mp3",
+    ],
+)
+def test_rejects_non_video_links(url):
+    assert _extract_video_id(url) == ""